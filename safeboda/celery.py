@@ -0,0 +1,16 @@
+"""
+Celery application for safeboda project.
+
+Tasks are discovered from the ``tasks`` module of every installed app.
+Run a worker with: celery -A safeboda worker -l info
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'safeboda.settings')
+
+app = Celery('safeboda')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
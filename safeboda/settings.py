@@ -147,6 +147,21 @@ CACHES = {
     }
 }
 
+# Celery Configuration
+CELERY_BROKER_URL = os.environ.get('CELERY_BROKER_URL', 'redis://127.0.0.1:6379/0')
+CELERY_TASK_ALWAYS_EAGER = os.environ.get('CELERY_TASK_ALWAYS_EAGER', 'False') == 'True'
+CELERY_TASK_IGNORE_RESULT = True
+CELERY_BEAT_SCHEDULE = {
+    'purge-verification-codes': {
+        'task': 'users.tasks.purge_verification_codes',
+        'schedule': timedelta(days=1),
+    },
+    'flush-rider-locations': {
+        'task': 'users.tasks.flush_rider_locations',
+        'schedule': timedelta(seconds=30),
+    },
+}
+
 INTERNAL_IPS = [
     "127.0.0.1",
 ]
@@ -194,5 +209,6 @@ SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=30),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
     'ROTATE_REFRESH_TOKENS': True,
-    'BLACKLIST_AFTER_ROTATION': True
+    'BLACKLIST_AFTER_ROTATION': True,
+    'TOKEN_OBTAIN_SERIALIZER': 'users.auth_serializers.UserTypeTokenObtainPairSerializer',
 }
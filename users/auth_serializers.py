@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError as DjangoValidationError
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 
 from users.models import User, District, VerificationCode, PasswordResetToken
 
@@ -46,7 +47,7 @@ class PhoneVerificationSerializer(serializers.Serializer):
     def validate_code(self, value):
         if not value.isdigit() or len(value) != 6:
             raise serializers.ValidationError("Code must be a 6-digit number.")
-        return value
+        return int(value)
 
 
 class EmailVerificationSerializer(serializers.Serializer):
@@ -59,7 +60,7 @@ class EmailVerificationSerializer(serializers.Serializer):
     def validate_code(self, value):
         if not value.isdigit() or len(value) != 6:
             raise serializers.ValidationError("Code must be a 6-digit number.")
-        return value
+        return int(value)
 
 
 class PasswordResetRequestSerializer(serializers.Serializer):
@@ -68,13 +69,6 @@ class PasswordResetRequestSerializer(serializers.Serializer):
     """
     email = serializers.EmailField()
 
-    def validate_email(self, value):
-        try:
-            user = User.objects.get(email=value)
-        except User.DoesNotExist:
-            raise serializers.ValidationError("No user found with this email address.")
-        return value
-
 
 class PasswordResetConfirmSerializer(serializers.Serializer):
     """
@@ -115,6 +109,8 @@ class AccountRecoverySerializer(serializers.Serializer):
                 raise serializers.ValidationError("Account is not locked.")
         except User.DoesNotExist:
             raise serializers.ValidationError("No matching account found.")
+        # Hand the matched user to the view so it does not fetch it again
+        attrs['user'] = user
         return attrs
 
 
@@ -134,3 +130,15 @@ class ResendVerificationSerializer(serializers.Serializer):
     """
     email = serializers.EmailField()
     verification_type = serializers.ChoiceField(choices=['phone', 'email'])
+
+
+class UserTypeTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """
+    Token serializer that embeds the user's type as a claim, so role checks
+    can read it from the token instead of the user row.
+    """
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token['user_type'] = user.user_type
+        return token
@@ -5,8 +5,10 @@ from drf_spectacular.utils import extend_schema
 from rest_framework import status, generics, permissions
 from rest_framework.views import APIView
 from rest_framework.response import Response
+from django.core.cache import cache
 from django.utils import timezone
 from django.db import transaction
+from django.db.models import Case, F, Value, When
 
 from users.models import User, VerificationCode, PasswordResetToken, District
 from users.auth_serializers import (
@@ -19,12 +21,86 @@ from users.auth_serializers import (
     AccountRecoverySerializer,
     DistrictSerializer,
 )
-from users.utils import (
+from users.tasks import (
     send_verification_email,
     send_sms_verification,
     send_password_reset_email,
-    send_account_recovery_notification,
+    send_account_recovery_email,
+    send_account_recovery_sms,
 )
+from users.utils import is_rate_limited
+
+
+def _too_many_attempts_response():
+    """Response returned when an endpoint's attempt limit is exceeded."""
+    return Response(
+        {'error': 'Too many attempts. Please try again later.'},
+        status=status.HTTP_429_TOO_MANY_REQUESTS
+    )
+
+
+def _rate_limit_field(request, name):
+    """
+    Value of a body field for building a rate limit key, read before the
+    serializer has checked that the body is an object.
+
+    Surrounding whitespace is stripped as the serializers do, so padded
+    variants of a value share its counter.
+    """
+    if not isinstance(request.data, dict):
+        return ''
+    return str(request.data.get(name, '')).strip()
+
+
+def _consume_code(user_filter, code, verification_type):
+    """
+    Redeem the latest unused verification code of ``verification_type`` for the
+    user matching ``user_filter`` (e.g. ``{'email': ...}``) and mark that channel
+    verified, activating the account once both phone and email are verified.
+
+    Returns a ``(user, None)`` tuple on success or ``(None, error_response)``.
+    """
+    verified_field = f'{verification_type}_verified'
+    other_field = 'email_verified' if verification_type == 'phone' else 'phone_verified'
+
+    # Find valid verification code, joining the user in the same query
+    verification = VerificationCode.objects.select_related('user').filter(
+        **{f'user__{field}': value for field, value in user_filter.items()},
+        code=code,
+        verification_type=verification_type,
+        is_used=False
+    ).order_by('-created_at').first()
+
+    if not verification:
+        if not User.objects.filter(**user_filter).exists():
+            return None, Response({'error': 'User not found.'}, status=status.HTTP_404_NOT_FOUND)
+        return None, Response({'error': 'Invalid verification code.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    if not verification.is_valid():
+        return None, Response({'error': 'Verification code has expired.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    user = verification.user
+
+    with transaction.atomic():
+        # Mark code as used; a concurrent request may have consumed it first
+        consumed = VerificationCode.objects.filter(
+            pk=verification.pk, is_used=False
+        ).update(is_used=True)
+        if not consumed:
+            return None, Response({'error': 'Invalid verification code.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Verify this channel and activate account if the other is already verified
+        User.objects.filter(pk=user.pk).update(
+            **{verified_field: True},
+            is_active=Case(When(**{other_field: True}, then=Value(True)), default=F('is_active')),
+            updated_at=timezone.now()
+        )
+
+    setattr(user, verified_field, True)
+    if getattr(user, other_field):
+        user.is_active = True
+
+    return user, None
 
 
 class RegisterView(APIView):
@@ -39,13 +115,14 @@ class RegisterView(APIView):
             with transaction.atomic():
                 user = serializer.save()
 
-                # Generate and send verification codes
-                phone_code = VerificationCode.generate_code(user, 'phone')
-                email_code = VerificationCode.generate_code(user, 'email')
+                # Generate both verification codes in a single INSERT
+                phone_code = VerificationCode.build(user, 'phone')
+                email_code = VerificationCode.build(user, 'email')
+                VerificationCode.objects.bulk_create([phone_code, email_code])
 
-                # Send verification notifications
-                send_sms_verification(user.phone_number, phone_code.code)
-                send_verification_email(user.email, email_code.code, user.first_name)
+                # Send verification notifications from a worker once the user is committed
+                transaction.on_commit(lambda: send_sms_verification.delay(user.phone_number, phone_code.formatted_code))
+                transaction.on_commit(lambda: send_verification_email.delay(user.email, email_code.formatted_code, user.first_name))
 
             return Response({
                 'message': 'Registration successful. Verification codes sent to your phone and email.',
@@ -64,43 +141,21 @@ class VerifyPhoneView(APIView):
     permission_classes = [permissions.AllowAny]
 
     def post(self, request):
+        # Reject repeated attempts before doing any database work
+        if is_rate_limited(f"verify:{_rate_limit_field(request, 'phone_number')}:phone"):
+            return _too_many_attempts_response()
+
         serializer = PhoneVerificationSerializer(data=request.data)
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-        phone_number = serializer.validated_data['phone_number']
-        code = serializer.validated_data['code']
-
-        try:
-            user = User.objects.get(phone_number=phone_number)
-        except User.DoesNotExist:
-            return Response({'error': 'User not found.'}, status=status.HTTP_404_NOT_FOUND)
-
-        # Find valid verification code
-        verification = VerificationCode.objects.filter(
-            user=user,
-            code=code,
-            verification_type='phone',
-            is_used=False
-        ).order_by('-created_at').first()
-
-        if not verification:
-            return Response({'error': 'Invalid verification code.'}, status=status.HTTP_400_BAD_REQUEST)
-
-        if not verification.is_valid():
-            return Response({'error': 'Verification code has expired.'}, status=status.HTTP_400_BAD_REQUEST)
-
-        # Mark code as used and verify phone
-        verification.is_used = True
-        verification.save()
-
-        user.phone_verified = True
-
-        # Activate account if both phone and email are verified
-        if user.email_verified:
-            user.is_active = True
-
-        user.save()
+        user, error_response = _consume_code(
+            {'phone_number': serializer.validated_data['phone_number']},
+            serializer.validated_data['code'],
+            'phone'
+        )
+        if error_response is not None:
+            return error_response
 
         return Response({
             'message': 'Phone verified successfully.',
@@ -117,43 +172,21 @@ class VerifyEmailView(APIView):
     permission_classes = [permissions.AllowAny]
     @extend_schema(request=EmailVerificationSerializer, responses={201: EmailVerificationSerializer}, description="Verify email")
     def post(self, request):
+        # Reject repeated attempts before doing any database work
+        if is_rate_limited(f"verify:{_rate_limit_field(request, 'email').lower()}:email"):
+            return _too_many_attempts_response()
+
         serializer = EmailVerificationSerializer(data=request.data)
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-        email = serializer.validated_data['email']
-        code = serializer.validated_data['code']
-
-        try:
-            user = User.objects.get(email=email)
-        except User.DoesNotExist:
-            return Response({'error': 'User not found.'}, status=status.HTTP_404_NOT_FOUND)
-
-        # Find valid verification code
-        verification = VerificationCode.objects.filter(
-            user=user,
-            code=code,
-            verification_type='email',
-            is_used=False
-        ).order_by('-created_at').first()
-
-        if not verification:
-            return Response({'error': 'Invalid verification code.'}, status=status.HTTP_400_BAD_REQUEST)
-
-        if not verification.is_valid():
-            return Response({'error': 'Verification code has expired.'}, status=status.HTTP_400_BAD_REQUEST)
-
-        # Mark code as used and verify email
-        verification.is_used = True
-        verification.save()
-
-        user.email_verified = True
-
-        # Activate account if both phone and email are verified
-        if user.phone_verified:
-            user.is_active = True
-
-        user.save()
+        user, error_response = _consume_code(
+            {'email': serializer.validated_data['email']},
+            serializer.validated_data['code'],
+            'email'
+        )
+        if error_response is not None:
+            return error_response
 
         return Response({
             'message': 'Email verified successfully.',
@@ -170,25 +203,18 @@ class PasswordResetRequestView(APIView):
     permission_classes = [permissions.AllowAny]
 
     def post(self, request):
+        # Reject repeated attempts before doing any database work
+        if is_rate_limited(f"password-reset:{_rate_limit_field(request, 'email').lower()}"):
+            return _too_many_attempts_response()
+
         serializer = PasswordResetRequestSerializer(data=request.data)
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-        email = serializer.validated_data['email']
-
-        try:
-            user = User.objects.get(email=email)
-        except User.DoesNotExist:
-            # Return success even if user not found (security best practice)
-            return Response({
-                'message': 'If an account with this email exists, a password reset link has been sent.'
-            }, status=status.HTTP_200_OK)
-
-        # Generate reset token
-        reset_token = PasswordResetToken.generate_token(user)
-
-        # Send reset email
-        send_password_reset_email(user.email, reset_token.token, user.first_name)
+        # The worker looks the account up, issues the token and sends the email.
+        # Known and unknown addresses get the same response in the same time
+        # (security best practice).
+        send_password_reset_email.delay(serializer.validated_data['email'])
 
         return Response({
             'message': 'If an account with this email exists, a password reset link has been sent.'
@@ -210,7 +236,9 @@ class PasswordResetConfirmView(APIView):
         new_password = serializer.validated_data['new_password']
 
         try:
-            reset_token = PasswordResetToken.objects.get(token=token_string)
+            reset_token = PasswordResetToken.objects.select_related('user').get(
+                token_hash=PasswordResetToken.hash_token(token_string)
+            )
         except PasswordResetToken.DoesNotExist:
             return Response({'error': 'Invalid reset token.'}, status=status.HTTP_400_BAD_REQUEST)
 
@@ -226,11 +254,11 @@ class PasswordResetConfirmView(APIView):
             user.is_account_locked = False
             user.account_locked_until = None
 
-        user.save()
+        user.save(update_fields=['password', 'is_account_locked', 'account_locked_until', 'updated_at'])
 
         # Mark token as used
         reset_token.is_used = True
-        reset_token.save()
+        reset_token.save(update_fields=['is_used'])
 
         return Response({
             'message': 'Password reset successful. You can now log in with your new password.'
@@ -243,9 +271,14 @@ class AccountStatusView(APIView):
     """
     permission_classes = [permissions.IsAuthenticated]
 
+    @extend_schema(responses={200: AccountStatusSerializer}, description="Get account verification status")
     def get(self, request):
-        serializer = AccountStatusSerializer(request.user)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        # Read-only projection of the authenticated user; no serializer instance needed
+        user = request.user
+        return Response(
+            {field: getattr(user, field) for field in AccountStatusSerializer.Meta.fields},
+            status=status.HTTP_200_OK
+        )
 
 
 class AccountRecoveryView(APIView):
@@ -255,28 +288,26 @@ class AccountRecoveryView(APIView):
     permission_classes = [permissions.AllowAny]
 
     def post(self, request):
+        # Reject repeated attempts before doing any database work
+        if is_rate_limited(f"account-recovery:{_rate_limit_field(request, 'email').lower()}"):
+            return _too_many_attempts_response()
+
         serializer = AccountRecoverySerializer(data=request.data)
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-        email = serializer.validated_data['email']
-        phone_number = serializer.validated_data['phone_number']
-
-        try:
-            user = User.objects.get(email=email, phone_number=phone_number)
-        except User.DoesNotExist:
-            return Response({'error': 'No matching account found.'}, status=status.HTTP_404_NOT_FOUND)
-
-        if not user.is_account_locked:
-            return Response({'error': 'Account is not locked.'}, status=status.HTTP_400_BAD_REQUEST)
+        # The serializer has already matched the locked account
+        user = serializer.validated_data['user']
 
         # Unlock account
         user.is_account_locked = False
         user.account_locked_until = None
-        user.save()
+        user.save(update_fields=['is_account_locked', 'account_locked_until', 'updated_at'])
 
-        # Send notification
-        send_account_recovery_notification(user.email, user.phone_number)
+        # Notify on both channels as separate tasks, so they are delivered
+        # in parallel and a failed channel is retried without resending the other
+        send_account_recovery_email.delay(user.email)
+        send_account_recovery_sms.delay(user.phone_number)
 
         return Response({
             'message': 'Account recovered successfully. You can now log in.'
@@ -291,3 +322,18 @@ class DistrictListView(generics.ListAPIView):
     queryset = District.objects.filter(is_active=True)
     serializer_class = DistrictSerializer
     pagination_class = None  # No pagination for districts
+
+    def list(self, request, *args, **kwargs):
+        """
+        Districts rarely change, so the list is cached for 24 hours.
+        The populate_rwanda_districts command clears it.
+
+        Rows are projected straight to dicts with values(); DistrictSerializer
+        only describes the response schema.
+        """
+        data = cache.get_or_set(
+            District.CACHE_KEY,
+            lambda: list(self.get_queryset().values(*DistrictSerializer.Meta.fields)),
+            60 * 60 * 24
+        )
+        return Response(data, status=status.HTTP_200_OK)
@@ -0,0 +1,34 @@
+"""
+Per-request summary of the authenticated user.
+"""
+from typing import NamedTuple, Optional
+
+
+class UserContext(NamedTuple):
+    id: Optional[int]
+    user_type: Optional[str]
+    is_staff: bool
+
+
+def get_user_context(request) -> UserContext:
+    """
+    Return the (id, user_type, is_staff) of the requesting user, resolved
+    once and kept on the request as ``request.user_ctx``.
+
+    Anonymous users get an id and user_type of None.
+
+    Args:
+        request: The DRF (or Django) request
+
+    Returns:
+        The user's UserContext
+    """
+    user_ctx = getattr(request, 'user_ctx', None)
+    if user_ctx is None:
+        user = request.user
+        if user and user.is_authenticated:
+            user_ctx = UserContext(user.pk, user.user_type, user.is_staff)
+        else:
+            user_ctx = UserContext(None, None, False)
+        request.user_ctx = user_ctx
+    return user_ctx
@@ -0,0 +1,172 @@
+"""
+Live rider positions kept in Redis and flushed to the database in batches.
+"""
+import logging
+import time
+
+from django.core.cache import cache
+from django.db import DataError, transaction
+from django.utils import timezone
+from django_redis import get_redis_connection
+
+from users.models import Rider
+
+logger = logging.getLogger(__name__)
+
+
+AVAILABLE_RIDERS_VERSION_KEY = 'available_riders:version'
+RIDERS_GEO_KEY = 'riders:geo'
+# Ids of riders whose position changed since the last flush
+RIDERS_DIRTY_KEY = 'riders:location_dirty'
+# Redis GEO indexes only accept latitudes within this range
+GEO_MAX_LATITUDE = 85.05112878
+# Number of dirty riders taken from Redis per flush round
+FLUSH_BATCH_SIZE = 500
+# Search radius of nearby rider queries, in kilometres
+NEARBY_RADIUS_KM = 5
+NEARBY_MAX_RADIUS_KM = 50
+
+
+def available_riders_cache_key():
+    """
+    Cache key of the current available riders payload.
+    Bumping the version switches to a new key instead of deleting the old one.
+    """
+    version = cache.get_or_set(AVAILABLE_RIDERS_VERSION_KEY, 1, None)
+    return f'available_riders:v{version}'
+
+
+def bump_available_riders_version():
+    cache.add(AVAILABLE_RIDERS_VERSION_KEY, 1, None)
+    cache.incr(AVAILABLE_RIDERS_VERSION_KEY)
+
+
+def rider_location_key(rider_id):
+    return f'rider:{rider_id}:location'
+
+
+def record_rider_location(rider_id, latitude, longitude):
+    """
+    Store a rider's position in Redis only: the GEO index, the last-seen
+    hash and the dirty set read by flush_rider_locations.
+
+    Args:
+        rider_id: Primary key of the rider
+        latitude: Latitude as submitted, already range checked
+        longitude: Longitude as submitted, already range checked
+    """
+    redis = get_redis_connection('default')
+    pipe = redis.pipeline(transaction=False)
+    pipe.geoadd(RIDERS_GEO_KEY, (float(longitude), float(latitude), rider_id))
+    pipe.hset(rider_location_key(rider_id), mapping={
+        'lat': str(latitude),
+        'lon': str(longitude),
+        'ts': time.time(),
+    })
+    pipe.sadd(RIDERS_DIRTY_KEY, rider_id)
+    pipe.execute()
+
+
+def get_rider_location(rider_id):
+    """
+    Last position recorded in Redis for a rider, which can be ahead of the
+    database by up to one flush interval.
+
+    Returns:
+        A (latitude, longitude) tuple of strings, or None if none is recorded
+    """
+    lat, lon = get_redis_connection('default').hmget(rider_location_key(rider_id), 'lat', 'lon')
+    if lat is None or lon is None:
+        return None
+    return lat.decode(), lon.decode()
+
+
+def riders_near(latitude, longitude, radius_km=NEARBY_RADIUS_KM):
+    """
+    Ids of riders whose live position is within radius_km of a point,
+    nearest first, answered from the riders:geo index.
+    """
+    rider_ids = get_redis_connection('default').geosearch(
+        RIDERS_GEO_KEY,
+        longitude=longitude,
+        latitude=latitude,
+        radius=radius_km,
+        unit='km',
+        sort='ASC',
+    )
+    return [int(rider_id) for rider_id in rider_ids]
+
+
+def forget_rider_location(rider_id):
+    """
+    Remove every live location entry of a rider, e.g. once it is deleted.
+    """
+    pipe = get_redis_connection('default').pipeline(transaction=False)
+    pipe.zrem(RIDERS_GEO_KEY, rider_id)
+    pipe.delete(rider_location_key(rider_id))
+    pipe.srem(RIDERS_DIRTY_KEY, rider_id)
+    pipe.execute()
+
+
+def flush_rider_locations():
+    """
+    Write the last recorded position of every dirty rider to the database.
+
+    Returns:
+        The number of riders updated
+    """
+    redis = get_redis_connection('default')
+    flushed = 0
+
+    try:
+        while True:
+            # SPOP is atomic, so positions recorded meanwhile stay for the next round
+            rider_ids = [int(rider_id) for rider_id in redis.spop(RIDERS_DIRTY_KEY, FLUSH_BATCH_SIZE) or []]
+            if not rider_ids:
+                break
+
+            try:
+                flushed += _flush_batch(redis, rider_ids)
+            except Exception:
+                # Put the batch back so the next run persists it
+                redis.sadd(RIDERS_DIRTY_KEY, *rider_ids)
+                raise
+    finally:
+        if flushed:
+            # Point available_riders at a fresh cache key
+            bump_available_riders_version()
+    return flushed
+
+
+def _flush_batch(redis, rider_ids):
+    pipe = redis.pipeline(transaction=False)
+    for rider_id in rider_ids:
+        pipe.hmget(rider_location_key(rider_id), 'lat', 'lon')
+    positions = {
+        rider_id: (lat.decode(), lon.decode())
+        for rider_id, (lat, lon) in zip(rider_ids, pipe.execute())
+        if lat is not None and lon is not None
+    }
+
+    # bulk_update skips auto_now, so updated_at is set here
+    now = timezone.now()
+    riders = list(Rider.objects.filter(pk__in=positions).only('pk'))
+    for rider in riders:
+        rider.current_latitude, rider.current_longitude = positions[rider.pk]
+        rider.updated_at = now
+    fields = ['current_latitude', 'current_longitude', 'updated_at']
+    try:
+        Rider.objects.bulk_update(riders, fields, batch_size=FLUSH_BATCH_SIZE)
+        return len(riders)
+    except DataError:
+        # One malformed position must not keep failing every later flush:
+        # save the batch row by row and drop the rows the database rejects
+        saved = 0
+        for rider in riders:
+            try:
+                with transaction.atomic():
+                    rider.save(update_fields=fields)
+                saved += 1
+            except DataError as e:
+                logger.error(f"Dropped unsavable position of rider {rider.pk}: {e}")
+        return saved
@@ -1,6 +1,8 @@
 import random
 from django.core.management.base import BaseCommand
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
 from users.models import Passenger, Rider
 
 User = get_user_model()
@@ -38,31 +40,43 @@ class Command(BaseCommand):
             self.style.SUCCESS(f'Starting to create {users_count} users, {passengers_count} passengers, and {riders_count} riders...')
         )
 
+        # Stage results are buffered and written once with the summary
+        messages = []
+
         # Create users
-        created_users = []
-        for i in range(users_count):
-            email = f'user{i+1}@safeboda.com'
-            if not User.objects.filter(email=email).exists():
+        emails = [f'user{i+1}@safeboda.com' for i in range(users_count)]
+        existing_emails = set(
+            User.objects.filter(email__in=emails).values_list('email', flat=True)
+        )
+        # Hash the shared test password once instead of once per user
+        hashed_password = make_password('testpass123')
+
+        new_users = []
+        for i, email in enumerate(emails):
+            if email not in existing_emails:
                 user_type = 'passenger' if i < passengers_count else 'rider' if i < passengers_count + riders_count else random.choice(['passenger', 'rider'])
-                user = User.objects.create_user(
+                new_users.append(User(
                     email=email,
-                    password='testpass123',
+                    password=hashed_password,
                     first_name=f'FirstName{i+1}',
                     last_name=f'LastName{i+1}',
                     user_type=user_type,
                     phone_number=f'+256{700000000 + i}',
                     is_active=True
-                )
-                created_users.append(user)
+                ))
 
-        self.stdout.write(
-            self.style.SUCCESS(f'Created {len(created_users)} users')
-        )
+        with transaction.atomic():
+            created_users = User.objects.bulk_create(new_users, batch_size=500)
+
+        messages.append(f'Created {len(created_users)} users')
+
+        # Create passengers, only for the dummy accounts so real users are untouched
+        passenger_users = User.objects.filter(
+            email__in=emails,
+            user_type='passenger',
+            passenger_profile__isnull=True
+        ).order_by('pk')[:passengers_count]
 
-        # Create passengers
-        passenger_users = [u for u in created_users if u.user_type == 'passenger'][:passengers_count]
-        created_passengers = []
-        
         home_addresses = [
             'Kampala Central, Uganda',
             'Nakawa Division, Kampala',
@@ -75,31 +89,36 @@ class Command(BaseCommand):
             'Kololo, Kampala',
             'Muyenga, Kampala'
         ]
-        
+
         payment_methods = ['momo', 'cash', 'card']
         languages = ['en', 'sw', 'lg']
 
-        for i, user in enumerate(passenger_users):
-            if not hasattr(user, 'passenger_profile'):
-                passenger = Passenger.objects.create(
-                    user=user,
-                    passenger_id=f'PASS{1000 + i}',
-                    preferred_payment_method=random.choice(payment_methods),
-                    home_address=random.choice(home_addresses),
-                    preferred_language=random.choice(languages),
-                    emergency_contact=f'+256{750000000 + i}',
-                    is_verified=random.choice([True, False])
-                )
-                created_passengers.append(passenger)
+        # Profile identifiers are derived from the user pk so reruns never collide
+        new_passengers = [
+            Passenger(
+                user=user,
+                passenger_id=f'PASS{1000 + user.pk}',
+                preferred_payment_method=random.choice(payment_methods),
+                home_address=random.choice(home_addresses),
+                preferred_language=random.choice(languages),
+                emergency_contact=f'+256{750000000 + user.pk}',
+                is_verified=random.choice([True, False])
+            )
+            for user in passenger_users
+        ]
 
-        self.stdout.write(
-            self.style.SUCCESS(f'Created {len(created_passengers)} passengers')
-        )
+        with transaction.atomic():
+            created_passengers = Passenger.objects.bulk_create(new_passengers, batch_size=500)
+
+        messages.append(f'Created {len(created_passengers)} passengers')
 
         # Create riders
-        rider_users = [u for u in created_users if u.user_type == 'rider'][:riders_count]
-        created_riders = []
-        
+        rider_users = User.objects.filter(
+            email__in=emails,
+            user_type='rider',
+            rider_profile__isnull=True
+        ).order_by('pk')[:riders_count]
+
         verification_statuses = ['pending', 'approved', 'rejected', 'suspended']
         kampala_coordinates = [
             ('0.3476', '32.5825'),  # Kampala Central
@@ -114,41 +133,45 @@ class Command(BaseCommand):
             ('0.2958', '32.6011'),  # Muyenga
         ]
 
-        for i, user in enumerate(rider_users):
-            if not hasattr(user, 'rider_profile'):
-                lat, lon = random.choice(kampala_coordinates)
-                # Add some randomness to coordinates
-                lat = str(float(lat) + random.uniform(-0.01, 0.01))
-                lon = str(float(lon) + random.uniform(-0.01, 0.01))
-                
-                rider = Rider.objects.create(
-                    user=user,
-                    license_number=f'DL{10000 + i}',
-                    verification_status=random.choice(verification_statuses),
-                    verification_notes=f'Verification notes for rider {i+1}',
-                    is_available=random.choice([True, False]),
-                    current_latitude=lat,
-                    current_longitude=lon,
-                    average_rating=round(random.uniform(3.0, 5.0), 1)
-                )
-                created_riders.append(rider)
-
-        self.stdout.write(
-            self.style.SUCCESS(f'Created {len(created_riders)} riders')
-        )
+        # Parse the base coordinates once and draw every rider's base point in one call
+        base_coordinates = [(float(lat), float(lon)) for lat, lon in kampala_coordinates]
+        rider_users = list(rider_users)
+        rider_bases = random.choices(base_coordinates, k=len(rider_users))
+
+        new_riders = []
+        for user, (base_lat, base_lon) in zip(rider_users, rider_bases):
+            # Add some randomness to coordinates
+            lat = str(base_lat + random.uniform(-0.01, 0.01))
+            lon = str(base_lon + random.uniform(-0.01, 0.01))
+
+            new_riders.append(Rider(
+                user=user,
+                license_number=f'DL{10000 + user.pk}',
+                verification_status=random.choice(verification_statuses),
+                verification_notes=f'Verification notes for rider {user.pk}',
+                is_available=random.choice([True, False]),
+                current_latitude=lat,
+                current_longitude=lon,
+                average_rating=round(random.uniform(3.0, 5.0), 1)
+            ))
+
+        with transaction.atomic():
+            created_riders = Rider.objects.bulk_create(new_riders, batch_size=500)
+
+        messages.append(f'Created {len(created_riders)} riders')
 
         # Display summary
         approved_riders = len([r for r in created_riders if r.verification_status == 'approved'])
         available_riders = len([r for r in created_riders if r.is_available and r.verification_status == 'approved'])
 
-        self.stdout.write(
-            self.style.SUCCESS(
-                f'\nDummy data creation completed!\n'
-                f'Total users: {User.objects.count()}\n'
-                f'Total passengers: {Passenger.objects.count()}\n'
-                f'Total riders: {Rider.objects.count()}\n'
-                f'Approved riders: {approved_riders}\n'
-                f'Available approved riders: {available_riders}\n'
-                f'\nYou can now test Redis caching with the available_riders endpoint!'
-            )
-        )
\ No newline at end of file
+        messages.append(
+            f'\nDummy data creation completed!\n'
+            f'Total users: {User.objects.count()}\n'
+            f'Total passengers: {Passenger.objects.count()}\n'
+            f'Total riders: {Rider.objects.count()}\n'
+            f'Approved riders: {approved_riders}\n'
+            f'Available approved riders: {available_riders}\n'
+            f'\nYou can now test Redis caching with the available_riders endpoint!'
+        )
+
+        self.stdout.write(self.style.SUCCESS('\n'.join(messages)))
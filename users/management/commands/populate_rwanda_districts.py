@@ -2,7 +2,9 @@
 Management command to populate Rwanda districts data.
 Run with: python manage.py populate_rwanda_districts
 """
+from django.core.cache import cache
 from django.core.management.base import BaseCommand
+from django.db import transaction
 from users.models import District
 
 
@@ -53,29 +55,34 @@ class Command(BaseCommand):
             {'name': 'Rutsiro', 'code': 'RUT', 'province': 'Western Province'},
         ]
 
-        created_count = 0
-        updated_count = 0
+        existing_codes = set(
+            District.objects.filter(
+                code__in=[d['code'] for d in districts_data]
+            ).values_list('code', flat=True)
+        )
 
-        for district_data in districts_data:
-            district, created = District.objects.update_or_create(
-                code=district_data['code'],
-                defaults={
-                    'name': district_data['name'],
-                    'province': district_data['province'],
-                    'is_active': True
-                }
+        # Upsert every district in a single INSERT ... ON CONFLICT statement
+        with transaction.atomic():
+            District.objects.bulk_create(
+                [
+                    District(
+                        code=d['code'],
+                        name=d['name'],
+                        province=d['province'],
+                        is_active=True,
+                    )
+                    for d in districts_data
+                ],
+                update_conflicts=True,
+                unique_fields=['code'],
+                update_fields=['name', 'province', 'is_active'],
             )
 
-            if created:
-                created_count += 1
-                self.stdout.write(
-                    self.style.SUCCESS(f'Created district: {district.name} ({district.code})')
-                )
-            else:
-                updated_count += 1
-                self.stdout.write(
-                    self.style.WARNING(f'Updated district: {district.name} ({district.code})')
-                )
+        # Drop the cached districts list so the endpoint serves fresh data
+        cache.delete(District.CACHE_KEY)
+
+        updated_count = len(existing_codes)
+        created_count = len(districts_data) - updated_count
 
         self.stdout.write(
             self.style.SUCCESS(
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-14 03:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_district_user_account_locked_until_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='verificationcode',
+            index=models.Index(fields=['user', 'verification_type', 'is_used', '-created_at'], name='verificationcode_lookup_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+import hashlib
+
+from django.db import migrations, models
+
+
+def hash_existing_tokens(apps, schema_editor):
+    PasswordResetToken = apps.get_model('users', 'PasswordResetToken')
+    reset_tokens = list(PasswordResetToken.objects.only('pk', 'token'))
+    for reset_token in reset_tokens:
+        reset_token.token_hash = hashlib.sha256(reset_token.token.encode()).hexdigest()
+    PasswordResetToken.objects.bulk_update(reset_tokens, ['token_hash'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_passwordresettoken_token_hash_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='passwordresettoken',
+            name='token_hash',
+            field=models.CharField(max_length=64, null=True),
+        ),
+        migrations.RunPython(hash_existing_tokens, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='passwordresettoken',
+            name='token_hash',
+            field=models.CharField(max_length=64, unique=True),
+        ),
+    ]
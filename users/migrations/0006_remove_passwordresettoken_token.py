@@ -0,0 +1,47 @@
+from django.db import migrations
+
+
+INDEX_NAME = 'passwordresettoken_token_hash_hash'
+
+
+def create_token_hash_index(apps, schema_editor):
+    """
+    Add a hash index for exact-match digest lookups on PostgreSQL.
+    Other backends keep relying on the index behind the unique constraint.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    PasswordResetToken = apps.get_model('users', 'PasswordResetToken')
+    schema_editor.execute(
+        'CREATE INDEX CONCURRENTLY IF NOT EXISTS %s ON %s USING hash (%s)' % (
+            schema_editor.quote_name(INDEX_NAME),
+            schema_editor.quote_name(PasswordResetToken._meta.db_table),
+            schema_editor.quote_name('token_hash'),
+        )
+    )
+
+
+def drop_token_hash_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        'DROP INDEX CONCURRENTLY IF EXISTS %s' % schema_editor.quote_name(INDEX_NAME)
+    )
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('users', '0005_passwordresettoken_token_hash'),
+    ]
+
+    operations = [
+        # Dropping the plaintext column also drops its hash index from 0004
+        migrations.RemoveField(
+            model_name='passwordresettoken',
+            name='token',
+        ),
+        migrations.RunPython(create_token_hash_index, drop_token_hash_index),
+    ]
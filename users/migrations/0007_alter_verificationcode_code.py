@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-14 03:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_remove_passwordresettoken_token'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='verificationcode',
+            name='code',
+            field=models.PositiveIntegerField(db_index=True),
+        ),
+    ]
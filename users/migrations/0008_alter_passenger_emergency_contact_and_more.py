@@ -0,0 +1,24 @@
+# Generated by Django 5.2.6 on 2026-10-14 03:07
+
+import users.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0007_alter_verificationcode_code'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='passenger',
+            name='emergency_contact',
+            field=models.CharField(blank=True, max_length=15, null=True, validators=[users.models.validate_phone]),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='phone_number',
+            field=models.CharField(blank=True, max_length=15, null=True, validators=[users.models.validate_phone]),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.6 on 2026-10-14 03:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0008_alter_passenger_emergency_contact_and_more'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='verificationcode',
+            name='verificationcode_lookup_idx',
+        ),
+        migrations.AddIndex(
+            model_name='verificationcode',
+            index=models.Index(condition=models.Q(('is_used', False)), fields=['user', 'verification_type', '-created_at'], name='vc_active_idx'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.6 on 2026-10-14 03:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0009_remove_verificationcode_verificationcode_lookup_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='rider',
+            index=models.Index(fields=['is_available', 'verification_status'], name='rider_available_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['user_type'], name='user_type_idx'),
+        ),
+    ]
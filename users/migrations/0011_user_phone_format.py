@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-14 03:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0010_rider_rider_available_idx_user_user_type_idx'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='user',
+            constraint=models.CheckConstraint(condition=models.Q(('phone_number__isnull', True), ('phone_number', ''), ('phone_number__regex', '^\\+?1?\\d{9,15}$'), _connector='OR'), name='phone_format'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-14 03:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0011_user_phone_format'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='passenger',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='rider',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
@@ -1,15 +1,37 @@
 from datetime import datetime, timedelta
 from typing import ClassVar, Any
+import hashlib
 import secrets
 
 from django.contrib.auth.base_user import BaseUserManager, AbstractBaseUser
 from django.contrib.auth.models import PermissionsMixin
-from django.core.validators import RegexValidator
 from django.db import models
 from django.db.models.fields import EmailField, CharField, BooleanField, DateTimeField
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 
+from users.utils import random_below
+
+
+# Phone number format, also enforced by the phone_format CHECK constraint
+PHONE_NUMBER_PATTERN = r'^\+?1?\d{9,15}$'
+
+
+def validate_phone(value: str) -> None:
+    """
+    Validate that a phone number is 9 to 15 digits with an optional leading '+'
+    (and optional country prefix '1'), i.e. PHONE_NUMBER_PATTERN.
+
+    Uses str.isdigit rather than a regex; isascii keeps out non-ASCII digits.
+    """
+    digits = value[1:] if value[:1] == '+' else value
+    if not (
+        digits.isascii()
+        and digits.isdigit()
+        and (9 <= len(digits) <= 15 or (len(digits) == 16 and digits[0] == '1'))
+    ):
+        raise ValidationError('Enter a valid phone number.', code='invalid')
+
 
 
 class CustomUserManager(BaseUserManager):
@@ -63,7 +85,7 @@ class User(AbstractBaseUser, PermissionsMixin):
         max_length=15,
         null=True,
         blank=True,
-        validators=[RegexValidator(r'^\+?1?\d{9,15}$')]
+        validators=[validate_phone]
     )
 
     # Fields required by Django
@@ -87,6 +109,23 @@ class User(AbstractBaseUser, PermissionsMixin):
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = []
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user_type'], name='user_type_idx'),
+        ]
+        constraints = [
+            # Lets the database reject malformed numbers on paths that skip
+            # model validation, such as bulk_create
+            models.CheckConstraint(
+                condition=(
+                    models.Q(phone_number__isnull=True)
+                    | models.Q(phone_number='')
+                    | models.Q(phone_number__regex=PHONE_NUMBER_PATTERN)
+                ),
+                name='phone_format',
+            ),
+        ]
+
     def __str__(self):
         return self.email
 
@@ -105,11 +144,11 @@ class Passenger(models.Model):
     home_address = models.TextField(max_length=100)
     profile_picture = models.ImageField(upload_to='passenger_profile_pictures/', null=True, blank=True)
     preferred_language = models.CharField(max_length=30, default='en')
-    emergency_contact = models.CharField(max_length=15, null=True, blank=True, validators=[RegexValidator(r'^\+?1?\d{9,15}$')])
+    emergency_contact = models.CharField(max_length=15, null=True, blank=True, validators=[validate_phone])
     is_verified = models.BooleanField(default=False)
 
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
 
     def __str__(self):
@@ -117,7 +156,12 @@ class Passenger(models.Model):
 
 
     def clean(self):
-        if self.user.user_type != 'passenger':
+        # Use the loaded user when available, else probe by key instead of fetching the row
+        if self._meta.get_field('user').is_cached(self):
+            is_passenger = self.user.user_type == 'passenger'
+        else:
+            is_passenger = User.objects.filter(pk=self.user_id, user_type='passenger').exists()
+        if not is_passenger:
             raise ValidationError('User is not a passenger')
 
 
@@ -148,7 +192,13 @@ class Rider(models.Model):
     average_rating = models.FloatField(default=0.0)
 
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            # Serves the available_riders filter
+            models.Index(fields=['is_available', 'verification_status'], name='rider_available_idx'),
+        ]
 
     def __str__(self):
         return f"Rider: {self.user.email}"
@@ -164,38 +214,71 @@ class VerificationCode(models.Model):
     )
 
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='verification_codes')
-    code = models.CharField(max_length=6)
+    # Stored as an integer (0..999999); use formatted_code when displaying it
+    code = models.PositiveIntegerField(db_index=True)
     verification_type = models.CharField(max_length=10, choices=VERIFICATION_TYPES)
     is_used = models.BooleanField(default=False)
     expires_at = models.DateTimeField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Serves the "latest unused code of a given type for a user" lookup;
+            # partial so it only covers codes that can still be redeemed
+            models.Index(
+                fields=['user', 'verification_type', '-created_at'],
+                condition=models.Q(is_used=False),
+                name='vc_active_idx',
+            ),
+        ]
+
     def __str__(self):
-        return f"{self.user.email} - {self.verification_type} - {self.code}"
+        return f"{self.user.email} - {self.verification_type} - {self.formatted_code}"
+
+    @property
+    def formatted_code(self):
+        """The code zero-padded to 6 digits, as sent to the user"""
+        return f"{self.code:06d}"
 
     def is_valid(self):
         """Check if the code is still valid (not expired and not used)"""
         return not self.is_used and timezone.now() < self.expires_at
 
     @classmethod
-    def generate_code(cls, user, verification_type, expiry_minutes=10):
-        """Generate a new 6-digit verification code"""
-        code = ''.join([str(secrets.randbelow(10)) for _ in range(6)])
+    def build(cls, user, verification_type, expiry_minutes=10):
+        """
+        Build an unsaved 6-digit verification code, e.g. for bulk_create.
+
+        The code is drawn from the pooled OS CSPRNG (utils.random_below), which
+        is uniform over 0..999999 and not predictable from previously issued codes.
+        """
+        code = random_below(1_000_000)
         expires_at = timezone.now() + timedelta(minutes=expiry_minutes)
-        return cls.objects.create(
+        return cls(
             user=user,
             code=code,
             verification_type=verification_type,
             expires_at=expires_at
         )
 
+    @classmethod
+    def generate_code(cls, user, verification_type, expiry_minutes=10):
+        """Generate and save a new 6-digit verification code"""
+        verification_code = cls.build(user, verification_type, expiry_minutes)
+        verification_code.save()
+        return verification_code
+
 
 class PasswordResetToken(models.Model):
     """
     Model to store password reset tokens.
+
+    Only a SHA-256 digest of the token is persisted; the raw token is handed
+    to the user once and looked up by its digest.
     """
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='reset_tokens')
-    token = models.CharField(max_length=64, unique=True)
+    # The unique constraint indexes token_hash; PostgreSQL also gets a hash index (migration 0006)
+    token_hash = models.CharField(max_length=64, unique=True)
     is_used = models.BooleanField(default=False)
     expires_at = models.DateTimeField()
     created_at = models.DateTimeField(auto_now_add=True)
@@ -207,22 +290,37 @@ class PasswordResetToken(models.Model):
         """Check if the token is still valid (not expired and not used)"""
         return not self.is_used and timezone.now() < self.expires_at
 
+    @staticmethod
+    def hash_token(token):
+        """Return the hex SHA-256 digest stored for a raw token"""
+        return hashlib.sha256(token.encode()).hexdigest()
+
     @classmethod
     def generate_token(cls, user, expiry_hours=24):
-        """Generate a new password reset token"""
+        """
+        Generate a new password reset token.
+
+        The token is 48 bytes from the OS CSPRNG (secrets.token_urlsafe).
+        Returns a (reset_token, raw_token) tuple; the raw token is not stored
+        and must be delivered to the user directly.
+        """
         token = secrets.token_urlsafe(48)
         expires_at = timezone.now() + timedelta(hours=expiry_hours)
-        return cls.objects.create(
+        reset_token = cls.objects.create(
             user=user,
-            token=token,
+            token_hash=cls.hash_token(token),
             expires_at=expires_at
         )
+        return reset_token, token
 
 
 class District(models.Model):
     """
     Model to store Rwanda districts for registration.
     """
+    # Cache key for the serialized active districts list
+    CACHE_KEY = 'districts:v1'
+
     name = models.CharField(max_length=100, unique=True)
     code = models.CharField(max_length=10, unique=True)
     province = models.CharField(max_length=50)
@@ -1,10 +1,17 @@
 from rest_framework.permissions import BasePermission
 
 
+from users.context import get_user_context
 from users.models import User
 
 
 
 class IsRiderRole(BasePermission):
     def has_permission(self, request, view):
-        return bool(request.user and request.user.is_authenticated and request.user.user_type == "rider")
+        # Prefer the user_type claim on the JWT; tokens issued before the
+        # claim existed fall back to the request's user context
+        auth = getattr(request, 'auth', None)
+        user_type = auth.get('user_type') if hasattr(auth, 'get') else None
+        if user_type is not None:
+            return user_type == "rider"
+        return get_user_context(request).user_type == "rider"
@@ -1,3 +1,4 @@
+from django.db import models
 from rest_framework import serializers
 
 from users.models import User, Passenger, Rider
@@ -9,6 +10,20 @@ class UserSerializer(serializers.ModelSerializer):
         fields = ['id', 'email', 'first_name', 'last_name', 'phone_number', 'user_type']
 
 
+class UserListSerializer(serializers.Serializer):
+    """
+    Read-only counterpart of UserSerializer for the user list, which is fed
+    values() rows rather than User instances.
+    """
+    def get_fields(self):
+        # Taken from UserSerializer, whose Meta.fields the values() projection
+        # also reads, so the two cannot drift apart
+        fields = UserSerializer().get_fields()
+        for field in fields.values():
+            field.read_only = True
+        return fields
+
+
 class PassengerSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     
@@ -33,4 +48,61 @@ class RiderSerializer(serializers.ModelSerializer):
             'is_available', 'current_latitude', 'current_longitude', 
             'average_rating', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'average_rating', 'created_at', 'updated_at']
\ No newline at end of file
+        # Locations are written only through update_location, which keeps
+        # the live position in Redis ahead of the database
+        read_only_fields = [
+            'id', 'average_rating', 'current_latitude', 'current_longitude',
+            'created_at', 'updated_at'
+        ]
+
+    @classmethod
+    def fast_list_queryset(cls, queryset):
+        """
+        Project a rider queryset onto the rows fast_list expects.
+        """
+        return queryset.values(
+            *(field for field in cls.Meta.fields if field != 'user'),
+            *(f'user__{field}' for field in UserSerializer.Meta.fields),
+        )
+
+    @classmethod
+    def fast_list(cls, rows, context=None):
+        """
+        Build the serialized form of many riders straight from
+        fast_list_queryset() rows, skipping the per-field DRF pipeline.
+
+        Only image and datetime columns need converting; every other value
+        is already in its serialized form.
+        """
+        request = (context or {}).get('request')
+        datetime_field = serializers.DateTimeField()
+
+        def image_url(storage):
+            def to_representation(name):
+                if not name:
+                    return None
+                url = storage.url(name)
+                return request.build_absolute_uri(url) if request is not None else url
+            return to_representation
+
+        converters = {}
+        for field in cls.Meta.fields:
+            model_field = Rider._meta.get_field(field)
+            if isinstance(model_field, models.ImageField):
+                converters[field] = image_url(model_field.storage)
+            elif isinstance(model_field, models.DateTimeField):
+                converters[field] = datetime_field.to_representation
+        user_keys = [(field, f'user__{field}') for field in UserSerializer.Meta.fields]
+
+        riders = []
+        for row in rows:
+            rider = {}
+            for field in cls.Meta.fields:
+                if field == 'user':
+                    rider['user'] = {name: row[key] for name, key in user_keys}
+                    continue
+                value = row[field]
+                converter = converters.get(field)
+                rider[field] = converter(value) if converter is not None and value is not None else value
+            riders.append(rider)
+        return riders
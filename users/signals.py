@@ -0,0 +1,17 @@
+"""
+Signal handlers keeping the live rider locations in Redis in step with the
+database.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from users.locations import forget_rider_location
+from users.models import Rider
+
+
+@receiver(post_delete, sender=Rider)
+def remove_deleted_rider_location(sender, instance, **kwargs):
+    # Only once the delete is committed, a rolled back one keeps the position
+    rider_id = instance.pk
+    transaction.on_commit(lambda: forget_rider_location(rider_id))
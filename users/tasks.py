@@ -0,0 +1,99 @@
+"""
+Celery tasks for delivering verification codes and notifications
+outside the request/response cycle.
+"""
+from datetime import timedelta
+
+from celery import shared_task
+from django.db.models import Q
+from django.utils import timezone
+
+from users import utils
+from users.locations import flush_rider_locations as _flush_rider_locations
+from users.models import User, VerificationCode, PasswordResetToken
+
+
+# Delivery helpers report failures by returning False; retry those sends
+DELIVERY_TASK_OPTIONS = {'bind': True, 'max_retries': 3, 'default_retry_delay': 30}
+
+
+@shared_task(**DELIVERY_TASK_OPTIONS)
+def send_sms_verification(self, phone_number: str, code: str) -> bool:
+    """
+    Send SMS verification code in the background.
+    """
+    if not utils.send_sms_verification(phone_number, code):
+        raise self.retry()
+    return True
+
+
+@shared_task(**DELIVERY_TASK_OPTIONS)
+def send_verification_email(self, email: str, code: str, user_name: str = "") -> bool:
+    """
+    Send verification email with OTP code in the background.
+    """
+    if not utils.send_verification_email(email, code, user_name):
+        raise self.retry()
+    return True
+
+
+@shared_task(**DELIVERY_TASK_OPTIONS)
+def send_password_reset_email(self, email: str) -> bool:
+    """
+    Issue a password reset token and email it to the account with this address.
+    Does nothing when no such account exists. A failed send deletes the token
+    it issued, so each retry issues a fresh one and the raw token never goes
+    through the broker.
+    """
+    user = User.objects.filter(email=email).first()
+    if user is None:
+        return False
+
+    reset_token, token = PasswordResetToken.generate_token(user)
+    if not utils.send_password_reset_email(user.email, token, user.first_name):
+        reset_token.delete()
+        raise self.retry()
+    return True
+
+
+@shared_task(**DELIVERY_TASK_OPTIONS)
+def send_account_recovery_email(self, email: str) -> bool:
+    """
+    Send the account recovery email in the background.
+    """
+    if not utils.send_account_recovery_email(email):
+        raise self.retry()
+    return True
+
+
+@shared_task(**DELIVERY_TASK_OPTIONS)
+def send_account_recovery_sms(self, phone_number: str) -> bool:
+    """
+    Send the account recovery SMS in the background.
+    """
+    if not utils.send_account_recovery_sms(phone_number):
+        raise self.retry()
+    return True
+
+
+@shared_task
+def purge_verification_codes(days: int = 7) -> int:
+    """
+    Delete used or expired verification codes older than ``days`` days.
+    Scheduled daily by Celery beat to keep the table small.
+    """
+    now = timezone.now()
+    deleted, _ = VerificationCode.objects.filter(
+        Q(is_used=True) | Q(expires_at__lt=now),
+        created_at__lt=now - timedelta(days=days)
+    ).delete()
+    return deleted
+
+
+@shared_task
+def flush_rider_locations() -> int:
+    """
+    Persist rider positions recorded in Redis since the last run.
+    Scheduled every 30 seconds by Celery beat.
+    """
+    return _flush_rider_locations()
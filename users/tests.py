@@ -1,3 +1,69 @@
-from django.test import TestCase
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from users import tasks, utils
+from users.models import User, PasswordResetToken
 
 # user creation test
+
+
+class PasswordResetEmailTaskTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='b@x.com', password='pass1234!', first_name='B')
+
+    def test_failed_send_is_retried_with_a_fresh_token(self):
+        with mock.patch('users.utils.send_password_reset_email', side_effect=[False, True]) as send:
+            result = tasks.send_password_reset_email.apply(args=('b@x.com',))
+
+        self.assertEqual(result.state, 'SUCCESS')
+        self.assertEqual(send.call_count, 2)
+        # Only the token that was actually delivered is left
+        delivered_token = send.call_args.args[1]
+        reset_token = PasswordResetToken.objects.get(user=self.user)
+        self.assertEqual(reset_token.token_hash, PasswordResetToken.hash_token(delivered_token))
+
+    def test_unknown_email_issues_no_token(self):
+        with mock.patch('users.utils.send_password_reset_email') as send:
+            result = tasks.send_password_reset_email.apply(args=('nobody@x.com',))
+
+        self.assertIs(result.result, False)
+        send.assert_not_called()
+        self.assertFalse(PasswordResetToken.objects.exists())
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class RateLimitedEndpointTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_non_object_body_is_rejected_as_bad_request(self):
+        for url in ['/api/v1/uas/verify-phone/', '/api/v1/uas/verify-email/',
+                    '/api/v1/uas/password-reset/', '/api/v1/uas/account/recover/']:
+            with self.subTest(url=url):
+                response = self.client.post(url, '[1]', content_type='application/json')
+                self.assertEqual(response.status_code, 400)
+
+    @mock.patch('users.auth_views.send_password_reset_email.delay')
+    def test_padded_values_share_the_attempt_counter(self, _delay):
+        cases = [
+            ('/api/v1/uas/verify-phone/', 'phone_number', '+256711111111', {'code': '123456'}),
+            ('/api/v1/uas/verify-email/', 'email', 'Padded@x.com', {'code': '123456'}),
+            ('/api/v1/uas/password-reset/', 'email', 'padded@x.com', {}),
+        ]
+        for url, field, value, extra in cases:
+            with self.subTest(url=url):
+                for attempt in range(6):
+                    data = {field: ' ' * attempt + value, **extra}
+                    response = self.client.post(url, data, content_type='application/json')
+                self.assertEqual(response.status_code, 429)
+
+
+class GenerateOtpTests(TestCase):
+    def test_codes_of_any_length_are_digits(self):
+        for length in [1, 6, 19, 20, 40]:
+            with self.subTest(length=length):
+                code = utils.generate_otp(length)
+                self.assertEqual(len(code), length)
+                self.assertTrue(code.isdigit())
@@ -32,5 +32,12 @@ uas_patterns = [
 ]
 
 urlpatterns = [
+    # Hot read path dispatched straight to the action; it must come before
+    # the router, whose rider detail route would otherwise match it
+    path(
+        'riders/available/',
+        RiderViewSet.as_view({'get': 'available_riders'}, detail=False),
+        name='riders-available',
+    ),
     path('uas/', include(uas_patterns)),
 ] + router.urls
\ No newline at end of file
@@ -1,17 +1,99 @@
 """
 Utility functions for authentication, verification, and notifications.
 """
-import secrets
+import os
 import logging
+import threading
+from functools import lru_cache
 from typing import Optional
 from django.conf import settings
-from django.core.mail import send_mail
-from django.template.loader import render_to_string
-from django.utils.html import strip_tags
+from django.core.cache import cache
+from django.core.mail import EmailMessage, EmailMultiAlternatives, get_connection, send_mail
+from django.template.loader import get_template
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=None)
+def get_email_templates(name: str) -> tuple:
+    """
+    Load the HTML and plain text templates of an email.
+
+    Templates are compiled once per process, and the plain text body has its
+    own template so no HTML has to be stripped at send time.
+
+    Args:
+        name: Template base name under users/templates/emails/
+
+    Returns:
+        A (html_template, text_template) tuple
+    """
+    return get_template(f"emails/{name}.html"), get_template(f"emails/{name}.txt")
+
+
+def _greeting(user_name: str) -> str:
+    # Personalized suffix of an email heading, shared by its HTML and text bodies
+    return f", {user_name}" if user_name else ""
+
+
+# Random bytes read from the OS CSPRNG in bulk and handed out under a lock,
+# so issuing a batch of codes costs one os.urandom call per 4 KiB
+_RNG_POOL_SIZE = 4096
+_RNG_POOL = bytearray()
+_RNG_OFFSET = 0
+_RNG_LOCK = threading.Lock()
+
+
+def _reset_rng_pool() -> None:
+    # A forked worker must never reuse bytes already handed out by its parent
+    global _RNG_POOL, _RNG_OFFSET, _RNG_LOCK
+    _RNG_POOL = bytearray()
+    _RNG_OFFSET = 0
+    _RNG_LOCK = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_rng_pool)
+
+
+def _random_bytes(count: int) -> bytes:
+    global _RNG_POOL, _RNG_OFFSET
+    if count > _RNG_POOL_SIZE:
+        return os.urandom(count)
+    with _RNG_LOCK:
+        if _RNG_OFFSET + count > len(_RNG_POOL):
+            _RNG_POOL = bytearray(os.urandom(_RNG_POOL_SIZE))
+            _RNG_OFFSET = 0
+        chunk = bytes(_RNG_POOL[_RNG_OFFSET:_RNG_OFFSET + count])
+        _RNG_OFFSET += count
+    return chunk
+
+
+def random_below(upper: int) -> int:
+    """
+    Return a uniformly distributed random integer in [0, upper).
+
+    Draws from the pooled OS CSPRNG bytes, at least 8 and always one byte
+    more than upper needs, and rejects the few values that would bias the
+    modulo.
+
+    Args:
+        upper: Exclusive upper bound, a positive integer
+
+    Returns:
+        A random integer
+    """
+    if upper <= 0:
+        raise ValueError("upper must be positive")
+    count = max(8, (upper.bit_length() + 7) // 8 + 1)
+    span = 256 ** count
+    limit = span - span % upper
+    while True:
+        value = int.from_bytes(_random_bytes(count), "big")
+        if value < limit:
+            return value % upper
+
+
 def generate_otp(length: int = 6) -> str:
     """
     Generate a random OTP code.
@@ -22,7 +104,34 @@ def generate_otp(length: int = 6) -> str:
     Returns:
         A string of random digits
     """
-    return ''.join([str(secrets.randbelow(10)) for _ in range(length)])
+    return f"{random_below(10 ** length):0{length}d}"
+
+
+def is_rate_limited(key: str, limit: int = 5, window: int = 60) -> bool:
+    """
+    Record an attempt against a key and check whether it exceeds the limit.
+
+    Uses a fixed-window counter in the cache, so rejected attempts cost a
+    single cache round-trip and never reach the database.
+
+    Args:
+        key: Identifier of the attempt scope, e.g. 'verify:<phone>:phone'
+        limit: Maximum number of attempts allowed per window (default: 5)
+        window: Window length in seconds (default: 60)
+
+    Returns:
+        True if the attempt is over the limit, False otherwise
+    """
+    cache_key = f"ratelimit:{key}"
+    # add() only sets the counter (and its expiry) when the window starts
+    cache.add(cache_key, 0, window)
+    try:
+        attempts = cache.incr(cache_key)
+    except ValueError:
+        # The window expired between add() and incr()
+        cache.set(cache_key, 1, window)
+        attempts = 1
+    return attempts > limit
 
 
 def send_sms(phone_number: str, message: str) -> bool:
@@ -46,6 +155,31 @@ def send_sms(phone_number: str, message: str) -> bool:
     return True
 
 
+def build_verification_email(email: str, code: str, user_name: str = "") -> EmailMultiAlternatives:
+    """
+    Build (without sending) the verification email with OTP code.
+
+    Args:
+        email: Recipient email address
+        code: Verification code
+        user_name: User's name for personalization
+
+    Returns:
+        The email message, ready to send alone or via send_bulk_emails
+    """
+    html_template, text_template = get_email_templates('verification')
+    context = {'code': code, 'greeting': _greeting(user_name)}
+
+    message = EmailMultiAlternatives(
+        subject='SafeBoda - Email Verification Code',
+        body=text_template.render(context),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[email],
+    )
+    message.attach_alternative(html_template.render(context), 'text/html')
+    return message
+
+
 def send_verification_email(email: str, code: str, user_name: str = "") -> bool:
     """
     Send verification email with OTP code.
@@ -59,33 +193,7 @@ def send_verification_email(email: str, code: str, user_name: str = "") -> bool:
         True if successful, False otherwise
     """
     try:
-        subject = 'SafeBoda - Email Verification Code'
-
-        # Create HTML email
-        html_message = f"""
-        <html>
-            <body>
-                <h2>Welcome to SafeBoda{', ' + user_name if user_name else ''}!</h2>
-                <p>Your email verification code is:</p>
-                <h1 style="color: #4CAF50; letter-spacing: 5px;">{code}</h1>
-                <p>This code will expire in 10 minutes.</p>
-                <p>If you didn't request this code, please ignore this email.</p>
-                <br>
-                <p>Best regards,<br>SafeBoda Team</p>
-            </body>
-        </html>
-        """
-
-        plain_message = strip_tags(html_message)
-
-        send_mail(
-            subject=subject,
-            message=plain_message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[email],
-            html_message=html_message,
-            fail_silently=False,
-        )
+        build_verification_email(email, code, user_name).send(fail_silently=False)
 
         logger.info(f"Verification email sent to {email}")
         return True
@@ -95,6 +203,44 @@ def send_verification_email(email: str, code: str, user_name: str = "") -> bool:
         return False
 
 
+def send_bulk_emails(messages: list[EmailMessage]) -> int:
+    """
+    Send many emails over a single reused backend connection.
+
+    Args:
+        messages: Email messages to send, e.g. from build_verification_email
+
+    Returns:
+        Number of messages sent (0 if the connection failed)
+    """
+    try:
+        with get_connection(fail_silently=False) as connection:
+            sent = connection.send_messages(messages) or 0
+
+        logger.info(f"Bulk email sent {sent} of {len(messages)} messages")
+        return sent
+
+    except Exception as e:
+        logger.error(f"Bulk email sending failed: {e}")
+        return 0
+
+
+def send_bulk_verification_emails(recipients: list[tuple[str, str, str]]) -> int:
+    """
+    Send verification emails to many recipients over a single connection.
+
+    Args:
+        recipients: (email, code, user_name) tuples
+
+    Returns:
+        Number of messages sent
+    """
+    return send_bulk_emails([
+        build_verification_email(email, code, user_name)
+        for email, code, user_name in recipients
+    ])
+
+
 def send_password_reset_email(email: str, token: str, user_name: str = "") -> bool:
     """
     Send password reset email with reset link.
@@ -113,24 +259,10 @@ def send_password_reset_email(email: str, token: str, user_name: str = "") -> bo
         # In production, use your actual frontend URL
         reset_url = f"{settings.FRONTEND_URL}/reset-password?token={token}"
 
-        html_message = f"""
-        <html>
-            <body>
-                <h2>Password Reset Request{', ' + user_name if user_name else ''}</h2>
-                <p>You requested to reset your password for your SafeBoda account.</p>
-                <p>Click the link below to reset your password:</p>
-                <p><a href="{reset_url}" style="background-color: #4CAF50; color: white; padding: 10px 20px; text-decoration: none; border-radius: 5px;">Reset Password</a></p>
-                <p>Or copy and paste this link into your browser:</p>
-                <p>{reset_url}</p>
-                <p>This link will expire in 24 hours.</p>
-                <p>If you didn't request this reset, please ignore this email.</p>
-                <br>
-                <p>Best regards,<br>SafeBoda Team</p>
-            </body>
-        </html>
-        """
-
-        plain_message = strip_tags(html_message)
+        html_template, text_template = get_email_templates('password_reset')
+        context = {'reset_url': reset_url, 'greeting': _greeting(user_name)}
+        html_message = html_template.render(context)
+        plain_message = text_template.render(context)
 
         send_mail(
             subject=subject,
@@ -164,13 +296,12 @@ def send_sms_verification(phone_number: str, code: str) -> bool:
     return send_sms(phone_number, message)
 
 
-def send_account_recovery_notification(email: str, phone_number: str) -> bool:
+def send_account_recovery_email(email: str) -> bool:
     """
-    Send account recovery notification.
+    Send the account recovery email.
 
     Args:
         email: User's email address
-        phone_number: User's phone number
 
     Returns:
         True if successful, False otherwise
@@ -178,20 +309,9 @@ def send_account_recovery_notification(email: str, phone_number: str) -> bool:
     try:
         subject = 'SafeBoda - Account Recovered'
 
-        html_message = """
-        <html>
-            <body>
-                <h2>Account Recovery Successful</h2>
-                <p>Your SafeBoda account has been successfully recovered.</p>
-                <p>You can now log in using your credentials.</p>
-                <p>If you didn't request this recovery, please contact support immediately.</p>
-                <br>
-                <p>Best regards,<br>SafeBoda Team</p>
-            </body>
-        </html>
-        """
-
-        plain_message = strip_tags(html_message)
+        html_template, text_template = get_email_templates('account_recovery')
+        html_message = html_template.render()
+        plain_message = text_template.render()
 
         send_mail(
             subject=subject,
@@ -202,12 +322,22 @@ def send_account_recovery_notification(email: str, phone_number: str) -> bool:
             fail_silently=False,
         )
 
-        # Also send SMS notification
-        sms_message = "Your SafeBoda account has been recovered. If you didn't request this, contact support."
-        send_sms(phone_number, sms_message)
-
         return True
 
     except Exception as e:
-        logger.error(f"Account recovery notification failed: {e}")
+        logger.error(f"Account recovery email failed to {email}: {e}")
         return False
+
+
+def send_account_recovery_sms(phone_number: str) -> bool:
+    """
+    Send the account recovery SMS.
+
+    Args:
+        phone_number: User's phone number
+
+    Returns:
+        True if successful, False otherwise
+    """
+    message = "Your SafeBoda account has been recovered. If you didn't request this, contact support."
+    return send_sms(phone_number, message)
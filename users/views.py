@@ -1,16 +1,98 @@
+import hashlib
+
 from django.shortcuts import render
 from django.core.cache import cache
+from django.db.models import Count, Max
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_etags
+from drf_spectacular.utils import OpenApiParameter, extend_schema
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.exceptions import PermissionDenied
+from rest_framework.pagination import CursorPagination
+from rest_framework.renderers import JSONRenderer
 
+from users.context import get_user_context
+from users.locations import (
+    GEO_MAX_LATITUDE,
+    NEARBY_MAX_RADIUS_KM,
+    NEARBY_RADIUS_KM,
+    available_riders_cache_key,
+    bump_available_riders_version,
+    get_rider_location,
+    record_rider_location,
+    riders_near,
+)
 from users.models import User, Passenger, Rider
-from users.serializers import UserSerializer, PassengerSerializer, RiderSerializer
+from users.serializers import UserSerializer, UserListSerializer, PassengerSerializer, RiderSerializer
 
 from .permissions import IsRiderRole
 
 
+class RiderCursorPagination(CursorPagination):
+    """
+    Cursor pagination for rider listings, most recently updated first.
+    """
+    ordering = '-updated_at'
+    page_size = 50
+
+
+class ConditionalListMixin:
+    """
+    Answer list requests with 304 Not Modified while the listed profiles and
+    their users are unchanged.
+
+    Validators come from one aggregate over the filtered queryset: the latest
+    updated_at (Last-Modified) plus the row count, so deletions also change
+    the ETag.
+    """
+    def list(self, request, *args, **kwargs):
+        stats = self.filter_queryset(self.get_queryset()).aggregate(
+            count=Count('pk'),
+            last_modified=Max('updated_at'),
+            user_last_modified=Max('user__updated_at'),
+        )
+        if not stats['count']:
+            return super().list(request, *args, **kwargs)
+
+        last_modified = max(stats['last_modified'], stats['user_last_modified'])
+        etag = f'"{stats["count"]}-{last_modified.timestamp()}"'
+        timestamp = int(last_modified.timestamp())
+
+        not_modified = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if not_modified is None:
+            response = super().list(request, *args, **kwargs)
+        else:
+            response = not_modified
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(timestamp)
+        return response
+
+
+def _coordinate(value, bound):
+    """
+    Normalize a submitted coordinate to the string form of its float value.
+    Raises ValueError unless it is a number within [-bound, bound].
+    """
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'Invalid coordinate: {value!r}')
+    if not -bound <= number <= bound:
+        raise ValueError(f'Coordinate out of range: {value!r}')
+    return str(number)
+
+
+def _profile_only_fields(serializer_class):
+    """
+    Columns read by a profile serializer, including its nested user,
+    for use with select_related('user').only(...).
+    """
+    return [*serializer_class.Meta.fields, *(f'user__{field}' for field in UserSerializer.Meta.fields)]
+
+
 class UserViewSet(viewsets.ModelViewSet):
     """
     ViewSet for managing User instances.
@@ -20,13 +102,27 @@ class UserViewSet(viewsets.ModelViewSet):
     serializer_class = UserSerializer
     permission_classes = [IsRiderRole]
 
+    def get_queryset(self):
+        """
+        List users as plain rows of the serialized columns; other actions
+        keep working on model instances.
+        """
+        if self.action == 'list':
+            return self.queryset.values(*UserSerializer.Meta.fields)
+        return self.queryset.all()
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return UserListSerializer
+        return UserSerializer
 
-class PassengerViewSet(viewsets.ModelViewSet):
+
+class PassengerViewSet(ConditionalListMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing Passenger instances.
     Provides CRUD operations for passenger profiles.
     """
-    queryset = Passenger.objects.all()
+    queryset = Passenger.objects.select_related('user')
     serializer_class = PassengerSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     
@@ -35,11 +131,12 @@ class PassengerViewSet(viewsets.ModelViewSet):
         Filter passengers based on user permissions.
         Regular users can only see their own passenger profile.
         """
-        if not self.request.user.is_authenticated:
+        user_ctx = get_user_context(self.request)
+        if user_ctx.id is None:
             return Passenger.objects.none()
-        if self.request.user.is_staff:
-            return Passenger.objects.all()
-        return Passenger.objects.filter(user=self.request.user)
+        if user_ctx.is_staff:
+            return self.queryset.all()
+        return self.queryset.filter(user_id=user_ctx.id)
     
     def perform_create(self, serializer):
         """
@@ -54,10 +151,13 @@ class PassengerViewSet(viewsets.ModelViewSet):
         """
         Get the current user's passenger profile.
         """
-        if not request.user.is_authenticated:
+        user_ctx = get_user_context(request)
+        if user_ctx.id is None:
             raise PermissionDenied("Authentication required to access profile.")
         try:
-            passenger = Passenger.objects.get(user=request.user)
+            passenger = Passenger.objects.select_related('user').only(
+                *_profile_only_fields(PassengerSerializer)
+            ).get(user_id=user_ctx.id)
             serializer = self.get_serializer(passenger)
             return Response(serializer.data, status=status.HTTP_200_OK)
         except Passenger.DoesNotExist:
@@ -67,13 +167,14 @@ class PassengerViewSet(viewsets.ModelViewSet):
             )
 
 
-class RiderViewSet(viewsets.ModelViewSet):
+class RiderViewSet(ConditionalListMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing Rider instances.
     Provides CRUD operations for rider profiles.
     """
-    queryset = Rider.objects.all()
+    queryset = Rider.objects.select_related('user')
     serializer_class = RiderSerializer
+    pagination_class = RiderCursorPagination
     # permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
@@ -82,11 +183,12 @@ class RiderViewSet(viewsets.ModelViewSet):
         Regular users can only see their own rider profile.
         Staff can see all riders.
         """
-        if not self.request.user.is_authenticated:
+        user_ctx = get_user_context(self.request)
+        if user_ctx.id is None:
             return Rider.objects.none()
-        if self.request.user.is_staff:
-            return Rider.objects.all()
-        return Rider.objects.filter(user=self.request.user)
+        if user_ctx.is_staff:
+            return self.queryset.all()
+        return self.queryset.filter(user_id=user_ctx.id)
     
     def perform_create(self, serializer):
         """
@@ -101,10 +203,13 @@ class RiderViewSet(viewsets.ModelViewSet):
         """
         Get the current user's rider profile.
         """
-        if not request.user.is_authenticated:
+        user_ctx = get_user_context(request)
+        if user_ctx.id is None:
             raise PermissionDenied("Authentication required to access profile.")
         try:
-            rider = Rider.objects.get(user=request.user)
+            rider = Rider.objects.select_related('user').only(
+                *_profile_only_fields(RiderSerializer)
+            ).get(user_id=user_ctx.id)
             serializer = self.get_serializer(rider)
             return Response(serializer.data, status=status.HTTP_200_OK)
         except Rider.DoesNotExist:
@@ -113,37 +218,86 @@ class RiderViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
     
+    @extend_schema(parameters=[
+        OpenApiParameter('latitude', float, description="Only list riders near this latitude"),
+        OpenApiParameter('longitude', float, description="Only list riders near this longitude"),
+        OpenApiParameter('radius', float, description=f"Search radius in km (default {NEARBY_RADIUS_KM})"),
+    ])
     @action(detail=False, methods=['get'])
     def available_riders(self, request):
         """
-        Get all available riders for passengers to see.
+        Get available riders for passengers to see, 50 per page.
         Uses Redis caching with 5-minute timeout.
+
+        The rendered JSON is cached together with its ETag, so cache hits skip
+        serialization and rendering, and clients holding the current payload
+        get a 304 via If-None-Match.
+
+        With latitude and longitude (and optionally radius, in km) only the
+        riders near that point are listed, found through the riders:geo index.
+        Those results change with every heartbeat, so they are not cached.
         """
-        cache_key = 'available_riders'
-        cached_data = cache.get(cache_key)
+        available_riders = Rider.objects.filter(is_available=True, verification_status='approved')
 
-        if cached_data is not None:
-            return Response(cached_data, status=status.HTTP_200_OK)
+        if 'latitude' in request.query_params or 'longitude' in request.query_params:
+            try:
+                latitude = float(_coordinate(request.query_params.get('latitude'), GEO_MAX_LATITUDE))
+                longitude = float(_coordinate(request.query_params.get('longitude'), 180))
+                radius = float(request.query_params.get('radius', NEARBY_RADIUS_KM))
+            except ValueError:
+                return Response(
+                    {'error': 'Invalid coordinates'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if not 0 < radius <= NEARBY_MAX_RADIUS_KM:
+                return Response(
+                    {'error': f'Radius must be between 0 and {NEARBY_MAX_RADIUS_KM} km'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            etag, rendered = self._render_available_riders(
+                available_riders.filter(pk__in=riders_near(latitude, longitude, radius))
+            )
+        else:
+            # Each page is cached separately under the current version, and per
+            # route, since the page links point back at the requested path
+            cursor = request.query_params.get(self.paginator.cursor_query_param, '')
+            cache_key = f'{available_riders_cache_key()}:{request.path}:{cursor}'
+            cached = cache.get(cache_key)
 
-        available_riders = Rider.objects.filter(
-            is_available=True,
-            verification_status='approved'
-        )
-        serializer = self.get_serializer(available_riders, many=True)
+            if cached is None:
+                cached = self._render_available_riders(available_riders)
 
-        # Cache for 5 minutes (300 seconds)
-        cache.set(cache_key, serializer.data, 300)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+                # Cache for 5 minutes (300 seconds)
+                cache.set(cache_key, cached, 300)
+
+            etag, rendered = cached
+
+        if_none_match = parse_etags(request.headers.get('If-None-Match', ''))
+        if etag in if_none_match or '*' in if_none_match:
+            return HttpResponseNotModified(headers={'ETag': etag})
+
+        return HttpResponse(rendered, content_type='application/json', headers={'ETag': etag})
     
+    def _render_available_riders(self, queryset):
+        """
+        Render one page of available riders, returning (etag, rendered JSON).
+        """
+        page = self.paginate_queryset(RiderSerializer.fast_list_queryset(queryset))
+        data = RiderSerializer.fast_list(page, context=self.get_serializer_context())
+        rendered = JSONRenderer().render(self.get_paginated_response(data).data)
+        etag = f'"{hashlib.md5(rendered, usedforsecurity=False).hexdigest()}"'
+        return etag, rendered
+
     @action(detail=True, methods=['patch'])
     def update_location(self, request, pk=None):
         """
         Update rider's current location.
         """
-        if not request.user.is_authenticated:
+        user_ctx = get_user_context(request)
+        if user_ctx.id is None:
             raise PermissionDenied("Authentication required to update location.")
         rider = self.get_object()
-        if rider.user != request.user and not request.user.is_staff:
+        if rider.user_id != user_ctx.id and not user_ctx.is_staff:
             return Response(
                 {'error': 'Permission denied'},
                 status=status.HTTP_403_FORBIDDEN
@@ -152,15 +306,36 @@ class RiderViewSet(viewsets.ModelViewSet):
         latitude = request.data.get('current_latitude')
         longitude = request.data.get('current_longitude')
 
+        # The database lags Redis by up to one flush, so a missing
+        # coordinate comes from the live position when there is one
+        if latitude is None or longitude is None:
+            live_location = get_rider_location(rider.pk)
+            if live_location is not None:
+                rider.current_latitude, rider.current_longitude = live_location
+
         if latitude is not None:
             rider.current_latitude = latitude
         if longitude is not None:
             rider.current_longitude = longitude
 
-        rider.save()
+        try:
+            if rider.current_latitude is not None:
+                rider.current_latitude = _coordinate(rider.current_latitude, GEO_MAX_LATITUDE)
+            if rider.current_longitude is not None:
+                rider.current_longitude = _coordinate(rider.current_longitude, 180)
+        except ValueError:
+            return Response(
+                {'error': 'Invalid coordinates'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-        # Clear available riders cache when location is updated
-        cache.delete('available_riders')
+        if rider.current_latitude is not None and rider.current_longitude is not None:
+            # Positions live in Redis; flush_rider_locations persists them
+            record_rider_location(rider.pk, rider.current_latitude, rider.current_longitude)
+        elif latitude is not None or longitude is not None:
+            # Without both coordinates there is nothing to index, so save directly
+            rider.save(update_fields=['current_latitude', 'current_longitude', 'updated_at'])
+            bump_available_riders_version()
 
         serializer = self.get_serializer(rider)
         return Response(serializer.data, status=status.HTTP_200_OK)